@@ -1,86 +1,127 @@
-import json
 import os
-import pandas as pd
-from datetime import datetime, timezone
-from typing import Dict, Any
+import polars as pl
+from typing import Optional
 
-def clean_raw_data(input_path: str, output_path: str) -> None:
+# Only the fields used below are parsed from the raw records.
+RAW_SCHEMA = {
+    'app_id': pl.Int64,
+    'name': pl.String,
+    'release_date': pl.String,
+    'original_price_cents': pl.Int32,
+    'current_price_cents': pl.Int32,
+    'is_free': pl.Boolean,
+    'genres': pl.List(pl.String),
+    'total_reviews': pl.Int64,
+    'positive_reviews': pl.Int64,
+    'owners_proxy': pl.Int64,
+    'snapshot_time': pl.String,
+}
+
+# Columns of the cleaned CSV written by clean_raw_data.
+CSV_COLUMNS = [
+    'app_id', 'name', 
+    'original_price_usd', 'current_price_usd', 'is_free', 
+    'owners_proxy', 'total_reviews', 'review_ratio',
+    'days_since_release', 'main_genre', 'release_date'
+]
+
+# Typed columns kept next to CSV_COLUMNS in the frame returned by
+# build_clean_frame, for callers that use it in memory: the parsed release
+# date and the exact prices in integer cents.
+TYPED_COLUMNS = ['release_dt', 'original_price_cents', 'current_price_cents']
+
+def build_clean_frame(input_path: str) -> Optional[pl.DataFrame]:
     """
-    Reads raw game data from a JSON file, performs data cleaning and 
-    feature engineering, and saves the final dataset to a CSV file.
+    Reads raw game data from a newline-delimited JSON file and performs
+    data cleaning and feature engineering in memory.
 
     Args:
-        input_path (str): The relative path to the raw JSON data file.
-        output_path (str): The relative path where the cleaned CSV data 
-                           will be saved.
+        input_path (str): The relative path to the raw NDJSON data file.
     
     Returns:
-        None: The result is saved directly to a file.
+        Optional[pl.DataFrame]: The cleaned dataset (CSV_COLUMNS followed by
+                                TYPED_COLUMNS), or None if the input could
+                                not be read or is empty.
     """
     
+    MIN_REVIEWS = 50 
+
+    raw = pl.scan_ndjson(input_path, schema=RAW_SCHEMA)
+
+    # The whole pipeline is a single lazy plan so Polars can fuse the column
+    # expressions and evaluate them in parallel.
+    cleaned = (raw
+        .filter(pl.all_horizontal([
+            pl.col('release_date').is_not_null(),
+            pl.col('total_reviews').is_not_null(),
+            pl.col('owners_proxy').is_not_null(),
+            pl.col('original_price_cents').is_not_null(),
+            pl.col('total_reviews') >= MIN_REVIEWS,
+        ]))
+        .with_columns([
+            # Prices stay int32 cents (kept in TYPED_COLUMNS); the float32
+            # dollars are only for presentation in the CSV.
+            (pl.col('original_price_cents') / 100).cast(pl.Float32).alias('original_price_usd'),
+            (pl.col('current_price_cents') / 100).cast(pl.Float32).alias('current_price_usd'),
+            (pl.col('positive_reviews') / pl.col('total_reviews')).alias('review_ratio'),
+            pl.col('release_date').str.strptime(pl.Date, format='%b %d, %Y', strict=False).alias('release_dt'),
+            pl.col('snapshot_time').str.slice(0, 10).str.to_date('%Y-%m-%d').alias('snapshot_dt'),
+            pl.col('genres').list.first().fill_null('Unknown').alias('main_genre'),
+            pl.col('is_free').cast(pl.Int8),
+        ])
+        .with_columns(
+            (pl.col('snapshot_dt') - pl.col('release_dt'))
+            .dt.total_days()
+            .alias('days_since_release')
+        )
+        .select(CSV_COLUMNS + TYPED_COLUMNS)
+    )
+
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
+        raw_count, df_clean = pl.collect_all([raw.select(pl.len()), cleaned])
     except FileNotFoundError:
         print(f"Error: Input file not found at {input_path}")
-        return
-    except json.JSONDecodeError:
+        return None
+    except pl.exceptions.ComputeError:
         print(f"Error: Could not decode JSON from {input_path}")
-        return
+        return None
 
-    if df.empty or len(df) == 0: 
+    if raw_count.item() == 0: 
         print("Warning: Input DataFrame is empty. Cannot perform cleaning.")
-        return
+        return None
 
-    print(f"Initial raw data size: {len(df)} records.")
-
-    MIN_REVIEWS = 50 
-    
-    df_clean = (df
-        .dropna(subset=['release_date', 'total_reviews', 'owners_proxy', 'original_price_cents'])
-        .copy()
-    )
-    df_clean = df_clean[df_clean['total_reviews'] >= MIN_REVIEWS]
+    print(f"Initial raw data size: {raw_count.item()} records.")
     
     print(f"Data size after cleaning and filtering: {len(df_clean)} records.")
-    
-    
-    df_clean['original_price_usd'] = df_clean['original_price_cents'] / 100
-    df_clean['current_price_usd'] = df_clean['current_price_cents'] / 100
 
-    df_clean['review_ratio'] = df_clean['positive_reviews'] / df_clean['total_reviews']
-    
-    snapshot_time_str = df_clean['snapshot_time'].iloc[0]
-    snapshot_dt = datetime.fromisoformat(snapshot_time_str.replace('Z', '+00:00')).replace(tzinfo=None)
-    df_clean['release_dt'] = pd.to_datetime(df_clean['release_date'], errors='coerce')
-    
-    df_clean['days_since_release'] = (
-        (snapshot_dt - df_clean['release_dt'])
-        .dt.days
-    )
-    
-    df_clean['main_genre'] = df_clean['genres'].apply(
-        lambda x: x[0] if isinstance(x, list) and len(x) > 0 else 'Unknown'
-    )
-    
-    df_clean['is_free'] = df_clean['is_free'].astype(int)
+    return df_clean
+
+
+def clean_raw_data(input_path: str, output_path: str) -> None:
+    """
+    Reads raw game data from a newline-delimited JSON file, performs data cleaning and 
+    feature engineering, and saves the final dataset to a CSV file.
 
+    Args:
+        input_path (str): The relative path to the raw NDJSON data file.
+        output_path (str): The relative path where the cleaned CSV data 
+                           will be saved.
     
-    final_cols = [
-        'app_id', 'name', 
-        'original_price_usd', 'current_price_usd', 'is_free', 
-        'owners_proxy', 'total_reviews', 'review_ratio',
-        'days_since_release', 'main_genre', 'release_date'
-    ]
+    Returns:
+        None: The result is saved directly to a file.
+    """
+    
+    df_clean = build_clean_frame(input_path)
+    if df_clean is None:
+        return
     
-    df_clean[final_cols].to_csv(output_path, index=False)
+    df_clean.select(CSV_COLUMNS).write_csv(output_path)
     
     print(f"Saved {len(df_clean)} cleaned records to {output_path}")
 
 
 if __name__ == "__main__":
-    INPUT_FILE = "Rawdata/games_raw.json" 
+    INPUT_FILE = "Rawdata/games_raw.jsonl" 
     OUTPUT_FILE = "data/processed/games_clean.csv"
     
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
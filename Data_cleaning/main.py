@@ -7,7 +7,7 @@ from Data_cleaning.clean_data import clean_raw_data
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
-RAW_DATA_PATH = os.path.join(BASE_DIR, "Data_collection", "Rawdata", "games_filtered.json")
+RAW_DATA_PATH = os.path.join(BASE_DIR, "Data_collection", "Rawdata", "games_filtered.jsonl")
 CLEAN_DATA_PATH = os.path.join(BASE_DIR, "Data_cleaning", "data", "processed", "games_clean.csv")
 
 if __name__ == "__main__":
@@ -1,13 +1,19 @@
-import json
-import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import os
 import random
 import re
 
-import requests
+import aiohttp
+import orjson
+import requests_cache
+from aiohttp_client_cache import CachedSession, SQLiteBackend
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
@@ -16,6 +22,51 @@ STEAM_APPDETAILS_URL = "https://store.steampowered.com/api/appdetails"
 STEAM_APPREVIEWS_URL = "https://store.steampowered.com/appreviews/"
 STEAMSPY_URL = "https://steamspy.com/api.php"
 
+# Politeness limits: apps processed at once, open sockets, and retries of a
+# rate-limited or failing request.
+MAX_CONCURRENT_APPS = 10
+MAX_CONNECTIONS = 20
+MAX_RETRIES = 5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Full API payloads kept next to each record for auditing. They are not
+# used by the cleaning step, so save_records moves them to a sidecar file.
+RAW_BLOB_FIELDS = ("raw_appdetails", "raw_review_summary")
+
+# Successful GET responses are cached on disk for a day, so reruns during
+# development are served locally instead of hitting Steam/SteamSpy again.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache")
+CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+
+
+@lru_cache(maxsize=None)
+def _get_web_api_session() -> requests_cache.CachedSession:
+    '''
+    Return the keep-alive, cached session for the synchronous Steam Web
+    API calls. It is created on first use, so importing this module does
+    not create the cache on disk. The API key parameter is left out of
+    the cache keys and stored responses.
+    '''
+    session = requests_cache.CachedSession(
+        os.path.join(CACHE_DIR, "steam_web_api"),
+        expire_after=CACHE_EXPIRE_SECONDS,
+        allowable_codes=(200,),
+        ignored_parameters=["key"],
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=MAX_CONNECTIONS,
+            pool_maxsize=MAX_CONNECTIONS,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=RETRY_STATUSES,
+            ),
+        ),
+    )
+    return session
+
 
 def get_app_list(max_results: int = 1000) -> List[Dict[str, Any]]:
     '''
@@ -35,7 +86,7 @@ def get_app_list(max_results: int = 1000) -> List[Dict[str, Any]]:
         "max_results": max_results,
     }
 
-    resp = requests.get(APPLIST_URL, params=params, timeout=30)
+    resp = _get_web_api_session().get(APPLIST_URL, params=params, timeout=30)
     resp.raise_for_status()
     data = resp.json()
 
@@ -53,18 +104,88 @@ def get_sample_app_ids(max_games: int = 300) -> List[int]:
     return app_ids
 
 
-def fetch_app_details(app_id: int) -> Optional[Dict[str, Any]]:
+def _make_session() -> aiohttp.ClientSession:
+    '''
+    Create the HTTP session shared by all per-app requests of a run.
+    The connector caps the number of open sockets across all hosts, and
+    successful responses are cached like those of _get_web_api_session.
+    '''
+    cache = SQLiteBackend(
+        os.path.join(CACHE_DIR, "steam_store_api"),
+        expire_after=CACHE_EXPIRE_SECONDS,
+        allowed_codes=(200,),
+    )
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    timeout = aiohttp.ClientTimeout(total=20)
+    return CachedSession(cache=cache, connector=connector, timeout=timeout)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    '''
+    Parse a Retry-After header, given either as a number of seconds or
+    as an HTTP date, into seconds to wait. Return None if the header is
+    missing or cannot be parsed.
+    '''
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def _get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: Dict[str, Any],
+) -> Optional[Any]:
+    '''
+    Issue a GET request and return the decoded JSON body, or None if the
+    status is not 200. Rate-limited (429) and 5xx responses listed in
+    RETRY_STATUSES are retried up to MAX_RETRIES attempts in total,
+    waiting as long as the Retry-After header asks or else with
+    exponential backoff. No wait follows the last attempt.
+    '''
+    delay = 1.0
+    for attempt in range(1, MAX_RETRIES + 1):
+        async with session.get(url, params=params) as resp:
+            if resp.status not in RETRY_STATUSES:
+                if resp.status != 200:
+                    return None
+                # Decode the body here: CachedResponse.json ignores loads
+                # and would parse cache hits with the stdlib json module
+                body = (await resp.read()).strip()
+                return orjson.loads(body) if body else None
+            wait = _retry_after_seconds(resp.headers.get("Retry-After"))
+
+        if attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(delay if wait is None else wait)
+        delay *= 2
+    return None
+
+
+async def fetch_app_details(
+    session: aiohttp.ClientSession,
+    app_id: int,
+) -> Optional[Dict[str, Any]]:
     '''
     Fetch detailed information for a single app from the Storefront
     appdetails endpoint. Only return data if the type is "game".
     Otherwise return None.
     '''
     params = {"appids": app_id, "cc": "us", "l": "en"}
-    resp = requests.get(STEAM_APPDETAILS_URL, params=params, timeout=20)
-    if resp.status_code != 200:
+    raw = await _get_json(session, STEAM_APPDETAILS_URL, params)
+    if not raw:
         return None
 
-    raw = resp.json()
     entry = raw.get(str(app_id))
     if not entry or not entry.get("success"):
         return None
@@ -76,7 +197,10 @@ def fetch_app_details(app_id: int) -> Optional[Dict[str, Any]]:
     return data
 
 
-def fetch_review_summary(app_id: int) -> Optional[Dict[str, Any]]:
+async def fetch_review_summary(
+    session: aiohttp.ClientSession,
+    app_id: int,
+) -> Optional[Dict[str, Any]]:
     '''
     Fetch aggregated review statistics for a single app from the
     /appreviews endpoint. Return the query_summary block, which
@@ -88,15 +212,17 @@ def fetch_review_summary(app_id: int) -> Optional[Dict[str, Any]]:
         "purchase_type": "all",
         "num_per_page": 0,
     }
-    resp = requests.get(f"{STEAM_APPREVIEWS_URL}{app_id}", params=params, timeout=20)
-    if resp.status_code != 200:
+    data = await _get_json(session, f"{STEAM_APPREVIEWS_URL}{app_id}", params)
+    if not data:
         return None
 
-    data = resp.json()
     return data.get("query_summary")
 
 
-def fetch_owners_proxy(app_id: int) -> Optional[int]:
+async def fetch_owners_proxy(
+    session: aiohttp.ClientSession,
+    app_id: int,
+) -> Optional[int]:
     '''
     Query the SteamSpy appdetails API for a single app and use the
     reported owners range as a proxy for sales. The function returns
@@ -105,11 +231,10 @@ def fetch_owners_proxy(app_id: int) -> Optional[int]:
     '''
     params = {"request": "appdetails", "appid": app_id}
     try:
-        resp = requests.get(STEAMSPY_URL, params=params, timeout=20)
-        if resp.status_code != 200:
+        data = await _get_json(session, STEAMSPY_URL, params)
+        if not data:
             return None
 
-        data = resp.json()
         owners_str = data.get("owners")
         if not owners_str:
             return None
@@ -131,71 +256,237 @@ def fetch_owners_proxy(app_id: int) -> Optional[int]:
         return None
 
 
-def fetch_and_save_raw_data(output_path: str, max_games: int = 300) -> None:
+def build_row(
+    app_id: int,
+    details: Dict[str, Any],
+    reviews: Optional[Dict[str, Any]],
+    owners_proxy: Optional[int],
+    snapshot_time: str,
+) -> Dict[str, Any]:
+    '''
+    Assemble the raw record saved for one app from the three API
+    responses. The layout is shared by fetch_and_save_raw_data and
+    fetch_filtered_games.
+    '''
+    total_reviews = None
+    positive_reviews = None
+    if reviews:
+        total_reviews = reviews.get("total_reviews")
+        positive_reviews = reviews.get("total_positive")
+
+    price = details.get("price_overview") or {}
+    original_price = price.get("initial")
+    current_price = price.get("final")
+
+    genres = details.get("genres") or []
+    genre_list = [g.get("description") for g in genres if g.get("description")]
+
+    return {
+        "app_id": app_id,
+        "name": details.get("name"),
+        "release_date": (details.get("release_date") or {}).get("date"),
+        "original_price_cents": original_price,
+        "current_price_cents": current_price,
+        "is_free": details.get("is_free"),
+        "genres": genre_list,
+        "total_reviews": total_reviews,
+        "positive_reviews": positive_reviews,
+        "owners_proxy": owners_proxy,
+        "snapshot_time": snapshot_time,
+        "raw_appdetails": details,
+        "raw_review_summary": reviews,
+    }
+
+
+async def _fetch_app_row(
+    sem: asyncio.Semaphore,
+    session: aiohttp.ClientSession,
+    app_id: int,
+    snapshot_time: str,
+    keep: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Optional[Dict[str, Any]]:
+    '''
+    Fetch appdetails for one app and, only if it is a game accepted by
+    keep (when given), fetch its review summary and owners proxy
+    concurrently. Return the assembled record, or None if the app was
+    skipped or a request failed.
+    '''
+    async with sem:
+        try:
+            details = await fetch_app_details(session, app_id)
+            if not details:
+                return None
+
+            if keep is not None and not keep(details):
+                return None
+
+            reviews, owners_proxy = await asyncio.gather(
+                fetch_review_summary(session, app_id),
+                fetch_owners_proxy(session, app_id),
+            )
+            return build_row(app_id, details, reviews, owners_proxy, snapshot_time)
+
+        except Exception as e:
+            print(f"Error on app_id={app_id}: {e}")
+            return None
+
+
+async def _collect_rows(app_ids: List[int], snapshot_time: str) -> List[Dict[str, Any]]:
+    '''
+    Run _fetch_app_row for every appid, with at most MAX_CONCURRENT_APPS
+    apps in flight at once, and return the records that were collected.
+    '''
+    sem = asyncio.Semaphore(MAX_CONCURRENT_APPS)
+    async with _make_session() as session:
+        rows = await asyncio.gather(
+            *[_fetch_app_row(sem, session, app_id, snapshot_time) for app_id in app_ids]
+        )
+    return [row for row in rows if row]
+
+
+def save_records(
+    records: List[Dict[str, Any]],
+    output_path: str,
+    raw_blobs_path: Optional[str] = None,
+) -> None:
+    '''
+    Write the records as newline-delimited JSON (one object per line),
+    which the cleaning step can scan without loading the whole file.
+
+    The RAW_BLOB_FIELDS payloads are left out of output_path. If
+    raw_blobs_path is given they are written there instead, keyed by
+    app_id; otherwise they are dropped.
+    '''
+    blobs_file = open(raw_blobs_path, "wb") if raw_blobs_path else None
+    try:
+        with open(output_path, "wb") as f:
+            for record in records:
+                row = {k: v for k, v in record.items() if k not in RAW_BLOB_FIELDS}
+                f.write(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+
+                if blobs_file:
+                    blobs = {"app_id": record["app_id"]}
+                    blobs.update({k: record.get(k) for k in RAW_BLOB_FIELDS})
+                    blobs_file.write(orjson.dumps(blobs, option=orjson.OPT_APPEND_NEWLINE))
+    finally:
+        if blobs_file:
+            blobs_file.close()
+
+
+def fetch_and_save_raw_data(
+    output_path: str,
+    max_games: int = 300,
+    raw_blobs_path: Optional[str] = None,
+) -> None:
     '''
     Orchestrate the full data collection pipeline:
     1) sample a set of appids,
     2) fetch appdetails, review summaries, and owners proxy for each app,
     3) assemble the fields into a list of dictionaries,
-    4) save the resulting list as a JSON file at output_path.
+    4) save the resulting list as an NDJSON file at output_path, with
+       the raw API payloads optionally saved to raw_blobs_path.
     '''
     snapshot_time = datetime.utcnow().isoformat() + "Z"
 
     app_ids = get_sample_app_ids(max_games=max_games)
-    results: List[Dict[str, Any]] = []
+    results = asyncio.run(_collect_rows(app_ids, snapshot_time))
+
+    save_records(results, output_path, raw_blobs_path)
+
+    print(f"Saved {len(results)} records to {output_path}")
+
+
+def _matches_filters(
+    details: Dict[str, Any],
+    min_year: Optional[int],
+    target_main_genre: Optional[str],
+    free_only: Optional[bool],
+) -> bool:
+    '''
+    Check the release year, genre and price conditions of
+    fetch_filtered_games against an appdetails payload.
+    '''
+    release_info = details.get("release_date") or {}
+    release_str = release_info.get("date")
+    release_year: Optional[int] = None
+    if release_str:
+        match = re.search(r"(\d{4})", release_str)
+        if match:
+            try:
+                release_year = int(match.group(1))
+            except ValueError:
+                release_year = None
+
+    if min_year is not None:
+        if release_year is None or release_year < min_year:
+            return False
+
+    genres = details.get("genres") or []
+    genre_list = [g.get("description") for g in genres if g.get("description")]
+
+    if target_main_genre is not None:
+        if target_main_genre.lower() == "indie":
+            if "Indie" not in genre_list:
+                return False
+        else:
+            main_genre = genre_list[0] if genre_list else None
+            if main_genre != target_main_genre:
+                return False
+
+    is_free = details.get("is_free")
+
+    if free_only is True and not is_free:
+        return False
+    if free_only is False and is_free:
+        return False
 
-    for idx, app_id in enumerate(app_ids, start=1):
+    return True
+
+
+async def _collect_filtered_rows(
+    app_ids: List[int],
+    snapshot_time: str,
+    target_n: int,
+    min_year: Optional[int],
+    target_main_genre: Optional[str],
+    free_only: Optional[bool],
+    sample_mode: str,
+) -> List[Dict[str, Any]]:
+    '''
+    Run _fetch_app_row for every appid with bounded concurrency. Reviews
+    and owners are only fetched for games that pass the filters. In
+    "random" mode the remaining requests are cancelled as soon as
+    target_n matching games have been collected.
+    '''
+    sem = asyncio.Semaphore(MAX_CONCURRENT_APPS)
+    candidates: List[Dict[str, Any]] = []
+
+    def keep(details: Dict[str, Any]) -> bool:
+        return _matches_filters(details, min_year, target_main_genre, free_only)
+
+    async with _make_session() as session:
+        tasks = [
+            asyncio.create_task(
+                _fetch_app_row(sem, session, app_id, snapshot_time, keep)
+            )
+            for app_id in app_ids
+        ]
         try:
-            details = fetch_app_details(app_id)
-            if not details:
-                continue
-
-            reviews = fetch_review_summary(app_id)
-            total_reviews = None
-            positive_reviews = None
-            if reviews:
-                total_reviews = reviews.get("total_reviews")
-                positive_reviews = reviews.get("total_positive")
-
-            owners_proxy = fetch_owners_proxy(app_id)
-
-            price = details.get("price_overview") or {}
-            original_price = price.get("initial")
-            current_price = price.get("final")
-
-            genres = details.get("genres") or []
-            genre_list = [g.get("description") for g in genres if g.get("description")]
-
-            row = {
-                "app_id": app_id,
-                "name": details.get("name"),
-                "release_date": details.get("release_date", {}).get("date"),
-                "original_price_cents": original_price,
-                "current_price_cents": current_price,
-                "is_free": details.get("is_free"),
-                "genres": genre_list,
-                "total_reviews": total_reviews,
-                "positive_reviews": positive_reviews,
-                "owners_proxy": owners_proxy,
-                "snapshot_time": snapshot_time,
-                "raw_appdetails": details,
-                "raw_review_summary": reviews,
-            }
-
-            results.append(row)
-
-            if idx % 50 == 0:
-                print(f"Fetched {idx} apps...")
-            time.sleep(0.3)
+            for next_row in asyncio.as_completed(tasks):
+                row = await next_row
+                if not row:
+                    continue
 
-        except Exception as e:
-            print(f"Error on app_id={app_id}: {e}")
-            continue
+                candidates.append(row)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+                if sample_mode == "random" and len(candidates) >= target_n:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    print(f"Saved {len(results)} records to {output_path}")
+    return candidates
 
 
 def fetch_filtered_games(
@@ -206,6 +497,7 @@ def fetch_filtered_games(
     free_only: Optional[bool] = None,
     sample_mode: str = "random",
     max_candidates: int = 5000,
+    raw_blobs_path: Optional[str] = None,
 ) -> None:
     '''
     Fetch a filtered sample of games based on user-specified conditions
@@ -234,8 +526,10 @@ def fetch_filtered_games(
     - > 0: soft limit on how many app ids are examined.
     - other values should be handled before this function is called.
 
-    The final selected games are written as a JSON list of records to
+    The final selected games are written as NDJSON records to
     output_path, using the same schema as fetch_and_save_raw_data.
+    If raw_blobs_path is given, the raw API payloads of the selected
+    games are written there.
     '''
     snapshot_time = datetime.utcnow().isoformat() + "Z"
 
@@ -247,90 +541,21 @@ def fetch_filtered_games(
     if sample_mode == "random":
         random.shuffle(app_ids)
 
-    candidates: List[Dict[str, Any]] = []
-
-    for idx, app_id in enumerate(app_ids, start=1):
-        try:
-            details = fetch_app_details(app_id)
-            if not details:
-                continue
-
-            release_info = details.get("release_date") or {}
-            release_str = release_info.get("date")
-            release_year: Optional[int] = None
-            if release_str:
-                match = re.search(r"(\d{4})", release_str)
-                if match:
-                    try:
-                        release_year = int(match.group(1))
-                    except ValueError:
-                        release_year = None
-
-            if min_year is not None:
-                if release_year is None or release_year < min_year:
-                    continue
-
-            genres = details.get("genres") or []
-            genre_list = [g.get("description") for g in genres if g.get("description")]
-
-            if target_main_genre is not None:
-                if target_main_genre.lower() == "indie":
-                    if "Indie" not in genre_list:
-                        continue
-                else:
-                    main_genre = genre_list[0] if genre_list else None
-                    if main_genre != target_main_genre:
-                        continue
-
-            is_free = details.get("is_free")
-
-            if free_only is True and not is_free:
-                continue
-            if free_only is False and is_free:
-                continue
-
-            reviews = fetch_review_summary(app_id)
-            total_reviews: Optional[int] = None
-            positive_reviews: Optional[int] = None
-            if reviews:
-                total_reviews = reviews.get("total_reviews")
-                positive_reviews = reviews.get("total_positive")
-
-            owners_proxy = fetch_owners_proxy(app_id)
-
-            price = details.get("price_overview") or {}
-            original_price = price.get("initial")
-            current_price = price.get("final")
-
-            row = {
-                "app_id": app_id,
-                "name": details.get("name"),
-                "release_date": release_info.get("date"),
-                "original_price_cents": original_price,
-                "current_price_cents": current_price,
-                "is_free": is_free,
-                "genres": genre_list,
-                "total_reviews": total_reviews,
-                "positive_reviews": positive_reviews,
-                "owners_proxy": owners_proxy,
-                "snapshot_time": snapshot_time,
-                "raw_appdetails": details,
-                "raw_review_summary": reviews,
-            }
-
-            candidates.append(row)
-
-            if sample_mode == "random" and len(candidates) >= target_n:
-                break
-
-        except Exception as e:
-            print(f"Error on app_id={app_id}: {e}")
-            continue
+    candidates = asyncio.run(
+        _collect_filtered_rows(
+            app_ids,
+            snapshot_time,
+            target_n=target_n,
+            min_year=min_year,
+            target_main_genre=target_main_genre,
+            free_only=free_only,
+            sample_mode=sample_mode,
+        )
+    )
 
     if not candidates:
         print("No games matched the given filters. Nothing will be saved.")
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=2)
+        save_records([], output_path, raw_blobs_path)
         return
 
     if sample_mode == "top":
@@ -346,8 +571,7 @@ def fetch_filtered_games(
             random.shuffle(candidates)
         candidates = candidates[:target_n]
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, ensure_ascii=False, indent=2)
+    save_records(candidates, output_path, raw_blobs_path)
 
     print(f"Saved {len(candidates)} filtered games to {output_path}")
 
@@ -463,6 +687,7 @@ def parse_filter_config(
 def run_from_config(
     config: Tuple[Any, ...],
     output_path: str,
+    raw_blobs_path: Optional[str] = None,
 ) -> None:
     '''
     Convenience wrapper that takes a compact configuration tuple and an
@@ -470,4 +695,8 @@ def run_from_config(
     parameters parsed from the tuple.
     '''
     params = parse_filter_config(config)
-    fetch_filtered_games(output_path=output_path, **params)
+    fetch_filtered_games(
+        output_path=output_path,
+        raw_blobs_path=raw_blobs_path,
+        **params,
+    )
@@ -43,10 +43,11 @@ def main() -> None:
     raw_cfg = input("Please enter your config tuple: ").strip()
     config = parse_tuple_input(raw_cfg)
 
-    output_path = "Rawdata/games_filtered.json"
+    output_path = "Rawdata/games_filtered.jsonl"
+    raw_blobs_path = "Rawdata/games_filtered_raw_blobs.jsonl"
 
     print("Working... collecting data from Steam API based on your config.\n")
-    run_from_config(config, output_path)
+    run_from_config(config, output_path, raw_blobs_path)
 
     print(f"Done. Saved filtered games to {output_path}")
 
@@ -1,10 +1,13 @@
 import os
-import json
+import sys
+from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
 
 import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
+import psycopg
+from psycopg.types.json import Jsonb
 from dotenv import load_dotenv
 
 # === 1. Load .env configuration ===
@@ -15,11 +18,15 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 # Explicitly load the .env file located in the project root directory
 load_dotenv(BASE_DIR / ".env")
 
+sys.path.append(str(BASE_DIR))
+from Data_cleaning.clean_data import build_clean_frame
 
-def get_connection():
+
+@lru_cache(maxsize=None)
+def get_connection_params() -> dict:
     """
-    Read PostgreSQL connection settings from .env
-    and establish a database connection.
+    Read PostgreSQL connection settings from .env.
+    The result is cached, so the environment is only parsed once.
     """
     host = os.getenv("PGHOST", "localhost")
     port = os.getenv("PGPORT", "5432")
@@ -33,31 +40,69 @@ def get_connection():
             "and fill in your PostgreSQL username."
         )
 
-    conn = psycopg2.connect(
-        host=host,
-        port=port,
-        dbname=dbname,
-        user=user,
-        password=password,
-    )
+    return {
+        "host": host,
+        "port": port,
+        "dbname": dbname,
+        "user": user,
+        "password": password,
+    }
+
+
+def get_connection():
+    """
+    Establish a database connection using the settings
+    from get_connection_params.
+    """
+    conn = psycopg.connect(**get_connection_params())
     return conn
 
 
-def load_clean_data_to_db(csv_path: str) -> None:
+# Column order and PostgreSQL types of the binary COPY stream
+# (names and types must match schema.sql)
+COPY_COLUMN_TYPES = {
+    "app_id": "int8",
+    "name": "text",
+    "release_date": "date",
+    "original_price": "numeric",
+    "current_price": "numeric",
+    "review_ratio": "numeric",
+    "owners_proxy": "int8",
+    "days_since_release": "int4",
+    "is_free": "bool",
+    "main_genre": "text",
+    "total_reviews": "int8",
+    "genres_json": "jsonb",
+    "raw_data_json": "jsonb",
+}
+COPY_COLUMNS = list(COPY_COLUMN_TYPES)
+
+# Dollar price columns of the cleaned data and the integer cents columns
+# that build_clean_frame keeps next to them
+PRICE_COLUMNS = {
+    "original_price_usd": "original_price_cents",
+    "current_price_usd": "current_price_cents",
+}
+
+
+def _to_nullable(col: pd.Series) -> list:
     """
-    Load the cleaned CSV file and insert its content into the `games` table
-    in the `steam_db` PostgreSQL database.
+    Convert a column to a list of Python values, with every missing
+    value (NaN / NaT / NA) replaced by None.
+    """
+    return col.astype(object).where(col.notna(), None).tolist()
+
+
+def prepare_games_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn the cleaned dataset into a DataFrame whose columns follow
+    COPY_COLUMNS and hold the values to store in the `games` table.
 
     Steps:
     - Validate required columns
     - Convert data types
     - Construct JSONB fields
-    - TRUNCATE TABLE before each import to keep data updated
-    - Use parameterized SQL insertion (execute_values)
     """
-    print(f"Reading CSV: {csv_path}")
-    df = pd.read_csv(csv_path)
-
     # === 2. Verify that all required columns exist ===
     expected_cols = [
         "app_id",
@@ -74,152 +119,176 @@ def load_clean_data_to_db(csv_path: str) -> None:
     ]
     missing = [c for c in expected_cols if c not in df.columns]
     if missing:
-        raise ValueError(f"CSV is missing required columns: {missing}")
+        raise ValueError(f"Cleaned data is missing required columns: {missing}")
 
     # === 3. Data type conversions ===
 
-    # Convert release_date from string format ("Nov 16, 2009") to Python date
-    df["release_date"] = pd.to_datetime(
-        df["release_date"],
-        format="%b %d, %Y",
-        errors="coerce",
-    ).dt.date
-
-    # Convert is_free: 0/1 → boolean
-    df["is_free"] = df["is_free"].astype(bool)
+    # Convert release_date to Python date; only the CSV still holds it as
+    # text ("Nov 16, 2009"), a frame from clean_and_load is already parsed
+    if not pd.api.types.is_datetime64_any_dtype(df["release_date"]):
+        df["release_date"] = pd.to_datetime(
+            df["release_date"],
+            format="%b %d, %Y",
+            errors="coerce",
+        )
+    df["release_date"] = df["release_date"].dt.date
+
+    # Convert is_free: 0/1 → nullable boolean, so a missing flag is
+    # stored as NULL rather than coerced to True
+    df["is_free"] = df["is_free"].astype("boolean")
+
+    # Prices are handled as integer cents: a frame from clean_and_load
+    # carries them in the *_cents columns, while the CSV only has dollars,
+    # which are converted back. NUMERIC values are built exactly from the
+    # cents, JSON values are the cents divided by 100
+    price_cents = {}
+    for usd_col, cents_col in PRICE_COLUMNS.items():
+        if cents_col in df.columns:
+            cents = df[cents_col].astype("Int64")
+        else:
+            cents = (df[usd_col].astype("float64") * 100).round().astype("Int64")
+        price_cents[usd_col] = _to_nullable(cents)
+        df[usd_col] = [
+            Decimal(int(c)).scaleb(-2) if c is not None else None
+            for c in price_cents[usd_col]
+        ]
+
+    df["review_ratio"] = [
+        Decimal(repr(v)) if v is not None else None
+        for v in _to_nullable(df["review_ratio"])
+    ]
 
     # === 4. Construct JSONB fields ===
 
+    main_genres = _to_nullable(df["main_genre"])
+
     # genres_json: store the main_genre as a list for JSONB compatibility
-    df["genres_json"] = df["main_genre"].apply(
-        lambda g: [g] if pd.notna(g) else []
+    df["genres_json"] = [[g] if g is not None else [] for g in main_genres]
+
+    # raw_data_json: store selected original fields as JSONB,
+    # built from whole columns rather than from row objects
+    raw_columns = zip(
+        [c / 100 if c is not None else None for c in price_cents["original_price_usd"]],
+        [c / 100 if c is not None else None for c in price_cents["current_price_usd"]],
+        main_genres,
+        _to_nullable(df["is_free"]),
     )
-
-    # raw_data_json: store selected original fields as JSONB
-    def build_raw(row):
-        return {
-            "original_price_usd": float(row["original_price_usd"])
-            if not pd.isna(row["original_price_usd"])
-            else None,
-            "current_price_usd": float(row["current_price_usd"])
-            if not pd.isna(row["current_price_usd"])
-            else None,
-            "main_genre": row["main_genre"],
-            "is_free": bool(row["is_free"]),
+    df["raw_data_json"] = [
+        {
+            "original_price_usd": orig_price,
+            "current_price_usd": curr_price,
+            "main_genre": genre,
+            "is_free": is_free,
         }
+        for orig_price, curr_price, genre, is_free in raw_columns
+    ]
 
-    df["raw_data_json"] = df.apply(build_raw, axis=1)
+    # Arrange the columns in COPY order; integer columns use the
+    # nullable Int64 dtype so missing values stay missing
+    return pd.DataFrame({
+        "app_id": df["app_id"].astype("int64"),
+        "name": df["name"],
+        "release_date": df["release_date"],
+        "original_price": df["original_price_usd"],
+        "current_price": df["current_price_usd"],
+        "review_ratio": df["review_ratio"],
+        "owners_proxy": df["owners_proxy"].astype("Int64"),
+        "days_since_release": df["days_since_release"].round().astype("Int64"),
+        "is_free": df["is_free"],
+        "main_genre": df["main_genre"],
+        "total_reviews": df["total_reviews"].astype("Int64"),
+        "genres_json": df["genres_json"],
+        "raw_data_json": df["raw_data_json"],
+    }, columns=COPY_COLUMNS)
+
+
+def _copy_records(copy_df: pd.DataFrame) -> Iterator[tuple]:
+    """
+    Yield the rows of a frame built by prepare_games_frame as tuples of
+    Python values matching COPY_COLUMN_TYPES, converting whole columns
+    at a time: missing values become None and JSONB values Jsonb (NUMERIC
+    columns already hold Decimal values).
+    """
+    columns = []
+    for name, pg_type in COPY_COLUMN_TYPES.items():
+        values = _to_nullable(copy_df[name])
+        if pg_type == "jsonb":
+            values = [Jsonb(v) for v in values]
+        columns.append(values)
 
-    # === 5. Connect to PostgreSQL and insert data ===
+    return zip(*columns)
 
-    conn = get_connection()
-    conn.autocommit = False
-    cur = conn.cursor()
 
+def copy_games_frame(conn, copy_df: pd.DataFrame) -> None:
+    """
+    Replace the content of the `games` table with the rows of a frame
+    built by prepare_games_frame, in a single transaction.
+
+    Steps:
+    - TRUNCATE TABLE before each import to keep data updated
+    - Stream the rows into the table with binary COPY ... FROM STDIN
+    """
     try:
-        # 5.1 Clear the table before inserting new data
-        print("Truncating table games...")
-        cur.execute("TRUNCATE TABLE games;")
-
-        # 5.2 SQL INSERT statement (column names must match schema.sql)
-        insert_sql = """
-            INSERT INTO games (
-                app_id,
-                name,
-                release_date,
-                original_price,
-                current_price,
-                review_ratio,
-                owners_proxy,
-                days_since_release,
-                is_free,
-                main_genre,
-                total_reviews,
-                genres_json,
-                raw_data_json
-            ) VALUES %s
-        """
-
-        # 5.3 Convert DataFrame rows into tuples for batch insertion
-        records = []
-        for _, row in df.iterrows():
-            # release_date: NaT -> None
-            rd = row["release_date"]
-            if pd.isna(rd):
-                rd = None
-
-            # days_since_release: NaN -> None, otherwise int
-            ds = row["days_since_release"]
-            if pd.isna(ds):
-                ds = None
-            else:
-                ds = int(round(float(ds)))
-
-            # owners_proxy: NaN -> None, otherwise int
-            owners = row["owners_proxy"]
-            if pd.isna(owners):
-                owners = None
-            else:
-                owners = int(owners)
-
-            # total_reviews: NaN -> None, otherwise int
-            total_reviews = row["total_reviews"]
-            if pd.isna(total_reviews):
-                total_reviews = None
-            else:
-                total_reviews = int(total_reviews)
-
-            # prices and ratio: NaN -> None, otherwise float
-            orig_price = row["original_price_usd"]
-            if pd.isna(orig_price):
-                orig_price = None
-            else:
-                orig_price = float(orig_price)
-
-            curr_price = row["current_price_usd"]
-            if pd.isna(curr_price):
-                curr_price = None
-            else:
-                curr_price = float(curr_price)
-
-            review_ratio = row["review_ratio"]
-            if pd.isna(review_ratio):
-                review_ratio = None
-            else:
-                review_ratio = float(review_ratio)
-
-            record = (
-                int(row["app_id"]),
-                row["name"],
-                rd,
-                orig_price,
-                curr_price,
-                review_ratio,
-                owners,
-                ds,
-                bool(row["is_free"]),
-                row["main_genre"],
-                total_reviews,
-                json.dumps(row["genres_json"]),
-                json.dumps(row["raw_data_json"]),
+        with conn.transaction(), conn.cursor() as cur:
+            # 5.1 Clear the table before inserting new data
+            print("Truncating table games...")
+            cur.execute("TRUNCATE TABLE games;")
+
+            # 5.2 Stream the rows into the table in binary format
+            copy_sql = (
+                f"COPY games ({', '.join(COPY_COLUMNS)}) "
+                "FROM STDIN WITH (FORMAT BINARY)"
             )
-            records.append(record)
 
-        print(f"Inserting {len(records)} rows into games...")
-        execute_values(cur, insert_sql, records)
-
-        conn.commit()
-        print("Done! Data successfully loaded into games.")
+            print(f"Copying {len(copy_df)} rows into games...")
+            with cur.copy(copy_sql) as copy:
+                copy.set_types(list(COPY_COLUMN_TYPES.values()))
+                for record in _copy_records(copy_df):
+                    copy.write_row(record)
     except Exception as e:
-        conn.rollback()
         print("Error loading data to DB:", e)
         raise
+
+    print("Done! Data successfully loaded into games.")
+
+
+def load_clean_data_to_db(csv_path: str) -> None:
+    """
+    Load the cleaned CSV file and insert its content into the `games` table
+    in the `steam_db` PostgreSQL database.
+    """
+    print(f"Reading CSV: {csv_path}")
+    df = pd.read_csv(csv_path, engine="pyarrow")
+    copy_df = prepare_games_frame(df)
+
+    # === 5. Connect to PostgreSQL and insert data ===
+    conn = get_connection()
+    try:
+        copy_games_frame(conn, copy_df)
     finally:
-        cur.close()
         conn.close()
 
 
+def clean_and_load(raw_path: str, conn) -> None:
+    """
+    Clean the raw NDJSON game records and load the result into the
+    `games` table directly from memory, without writing or re-reading
+    the intermediate CSV file.
+    """
+    df_clean = build_clean_frame(raw_path)
+    if df_clean is None:
+        return
+
+    # Hand over the release date parsed by the cleaner instead of the text
+    df_clean = df_clean.drop("release_date").rename({"release_dt": "release_date"})
+
+    copy_games_frame(conn, prepare_games_frame(df_clean.to_pandas()))
+
+
 if __name__ == "__main__":
-    # Compute the CSV path (relative to project root)
-    csv_path = BASE_DIR / "Data_cleaning" / "data" / "processed" / "games_clean.csv"
-    load_clean_data_to_db(str(csv_path))
+    raw_path = BASE_DIR / "Data_collection" / "Rawdata" / "games_filtered.jsonl"
+    conn = get_connection()
+    try:
+        clean_and_load(str(raw_path), conn)
+    finally:
+        conn.close()